@@ -6,7 +6,7 @@ import math
 import random
 import logging
 from enum import IntEnum
-from typing import Dict, List, Optional, Any, Union, Set
+from typing import Dict, List, Optional, Any, Union, Set, Tuple
 
 # ------------------ LOGGING ------------------
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] (Id: %(name)s) %(message)s')
@@ -17,6 +17,7 @@ TICK_DT = 1.0 / TICK_HZ
 
 LEADER_TIMEOUT = 2.5          # Seconds before declaring leader dead
 TASK_STABILITY_TIME = 60.0    # Seconds to lock a task assignment
+REGION_SIZE = 25.0            # Side of a square regional cluster (hierarchical mode)
 
 # ------------------ ENUMS & TYPES ------------------
 class Role(IntEnum):
@@ -24,31 +25,93 @@ class Role(IntEnum):
     LEADER = 1
     CANDIDATE = 2  # Future-proofing for more complex elections
 
+Region = Tuple[int, int]
+
 class MsgType:
     HB = "HB"
     TASK_NEW = "TASK_NEW"
     TASK_ASSIGN = "TASK_ASSIGN"
     TASK_DONE = "TASK_DONE"
+    TASK_ROUTE = "TASK_ROUTE"          # Top-level leader -> regional cluster
+    TASK_ROUTE_ACK = "TASK_ROUTE_ACK"  # Regional leader -> top-level leader: "we have it"
+    TASK_BOUNCE = "TASK_BOUNCE"        # Regional leader -> top-level leader: "nobody here can do it"
+
+class Event:
+    """Observable state changes, published to listeners via on_event()."""
+    JOIN = "JOIN"            # role, term, hierarchical
+    ROLE = "ROLE"            # old, new
+    TERM = "TERM"            # old, new
+    ASSIGN = "ASSIGN"        # task_id, to
+    COMPLETE = "COMPLETE"    # task_id
+    SEND = "SEND"            # count
+    RECV = "RECV"            # count
 
 # ------------------ AGENT ------------------
 class Agent:
-    def __init__(self, robot_id: int, capability: str, env: Any):
+    def __init__(self, robot_id: int, capability: str, env: Any, listeners: Optional[List[Any]] = None,
+                 hierarchical: bool = False):
         self.id = robot_id
         self.capability = capability
         self.env = env
         self.logger = logging.getLogger(str(self.id))
+        self.listeners: List[Any] = list(listeners or [])
 
         # State
-        self.role: Role = Role.FOLLOWER
+        self._role: Role = Role.FOLLOWER
         self.leader_id: Optional[int] = None
-        self.term: int = 0  # Election term (Epoch) for conflict resolution
+        self._term: int = 0  # Election term (Epoch) for conflict resolution
 
         # Knowledge Bases
         self.last_seen: Dict[int, float] = {}          # robot_id -> timestamp (local time)
         self.known_tasks: Dict[int, Dict[str, Any]] = {}  # task_id -> task dict
+        self.pending: Dict[int, Dict[str, Any]] = {}      # open tasks still worth looking at (not parked)
         self.current_task: Optional[int] = None           # ID of task currently being executed
 
+        # Parked Tasks: no capable robot in range. Woken by heartbeats, not polled.
+        self.parked: Dict[str, Set[int]] = {}   # capability -> task ids
+        self.parked_ids: Set[int] = set()
+
+        # Hierarchical Mode: Role.LEADER means "leader of my region"; the
+        # lowest-ID regional leader also acts as top-level router.
+        self.hierarchical = hierarchical
+        self.region: Optional[Region] = None
+        self.peer_region: Dict[int, Optional[Region]] = {}  # robot_id -> last advertised region
+        self.leader_seen: Dict[int, float] = {}             # regional leader id -> timestamp
+
+        # Top-Level Routing: only filled while we are the top-level leader
+        self.top_leader = False
+        self.routing: Dict[int, Dict[str, Any]] = {}                # task id -> task awaiting a regional ack
+        self.routed: Dict[Tuple[Region, int], Dict[int, Dict[str, Any]]] = {}  # (region, acking leader) -> tasks
+        self.stranded: Dict[str, Dict[int, Dict[str, Any]]] = {}    # capability -> tasks no region can serve
+
         self.now = self.env.get_time()
+        self.publish(Event.JOIN, role=int(self._role), term=self._term, hierarchical=self.hierarchical)
+
+    # ------------------ OBSERVABLE STATE ------------------
+    @property
+    def role(self) -> Role:
+        return self._role
+
+    @role.setter
+    def role(self, value: Role):
+        if value != self._role:
+            old, self._role = self._role, value
+            self.publish(Event.ROLE, old=int(old), new=int(value))
+
+    @property
+    def term(self) -> int:
+        return self._term
+
+    @term.setter
+    def term(self, value: int):
+        if value != self._term:
+            old, self._term = self._term, value
+            self.publish(Event.TERM, old=old, new=value)
+
+    def publish(self, kind: str, **fields):
+        """Push an event to every listener (metrics, tracing, ...)."""
+        for listener in self.listeners:
+            listener.on_event(kind, self.id, self.now, **fields)
 
     def step(self):
         """Called by simulator once per step."""
@@ -61,23 +124,55 @@ class Agent:
         msg["from"] = self.id
         msg["term"] = self.term 
         self.env.send(msg)
+        self.publish(Event.SEND, count=1)
 
     def receive(self) -> List[Dict[str, Any]]:
         """Safe wrapper for environment receive."""
-        return self.env.receive(self.id)
+        msgs = self.env.receive(self.id)
+        if msgs:
+            self.publish(Event.RECV, count=len(msgs))
+        return msgs
 
     # ------------------ HEARTBEAT PROTOCOL ------------------
     def send_heartbeat(self):
-        self.send({
+        msg = {
             "type": MsgType.HB,
-            "role": int(self.role) # Send role to detect conflicts
-        })
+            "role": int(self.role), # Send role to detect conflicts
+            "cap": self.capability  # Lets leaders match newcomers to waiting tasks
+        }
+        if self.hierarchical:
+            msg["region"] = self.region
+        self.send(msg)
 
     def handle_heartbeat(self, msg: Dict[str, Any]):
         sender = msg["from"]
         remote_term = msg.get("term", 0)
         remote_role = Role(msg.get("role", Role.FOLLOWER))
 
+        # Joined or recovered? (never heard, or silent past the timeout)
+        arrived = (self.now - self.last_seen.get(sender, -math.inf)) > LEADER_TIMEOUT
+
+        # Cluster Scope: terms and conflicts only apply within a region
+        if self.hierarchical:
+            region = msg.get("region")
+            region = tuple(region) if region is not None else None
+            moved = self.peer_region.get(sender) != region
+            self.peer_region[sender] = region
+            if remote_role == Role.LEADER:
+                self.leader_seen[sender] = self.now
+            else:
+                self.leader_seen.pop(sender, None)
+
+            if (arrived or moved) and self.stranded.get(msg.get("cap")):
+                self.unstrand(msg["cap"])
+
+            if region != self.region:
+                self.last_seen[sender] = self.now
+                return
+
+        if arrived and self.parked:
+            self.wake_parked(msg.get("cap"))
+
         # Term Check: Join higher term if we are behind
         if remote_term > self.term:
             self.term = remote_term
@@ -113,6 +208,11 @@ class Agent:
         if self.leader_id is None:
             return True
 
+        # Our leader moved out of (or we moved out of) its region
+        if self.hierarchical and self.leader_id != self.id:
+            if self.peer_region.get(self.leader_id) != self.region:
+                return True
+
         last = self.last_seen.get(self.leader_id, 0.0)
         return (self.now - last) > LEADER_TIMEOUT
 
@@ -120,11 +220,13 @@ class Agent:
         """
         Deterministic, ID-based election. 
         Only runs if leader is dead or unknown.
+        In hierarchical mode only peers in our own region are eligible.
         """
         # 1. Who is alive?
         alive = [
             rid for rid, t in self.last_seen.items()
             if (self.now - t) <= LEADER_TIMEOUT
+            and (not self.hierarchical or self.peer_region.get(rid) == self.region)
         ]
         alive.append(self.id)
         
@@ -134,6 +236,7 @@ class Agent:
         # 3. Apply Decision
         if new_leader == self.id:
             if self.role != Role.LEADER:
+                self.reload_pending() # Fresh leader re-evaluates everything once
                 self.term += 1 # Start new term!
                 self.role = Role.LEADER
                 self.leader_id = self.id
@@ -142,11 +245,241 @@ class Agent:
             self.role = Role.FOLLOWER
             self.leader_id = new_leader
 
+    # ------------------ REGIONS (HIERARCHICAL MODE) ------------------
+    @staticmethod
+    def region_at(location) -> Region:
+        return (int(location[0] // REGION_SIZE), int(location[1] // REGION_SIZE))
+
+    def region_of(self, robot_id: int) -> Optional[Region]:
+        pos = self.env.get_position(robot_id)
+        if pos is None: return None
+        return self.region_at(pos)
+
+    def task_region(self, task: Dict) -> Optional[Region]:
+        region = task.get("region")
+        return tuple(region) if region is not None else None
+
+    def regional_leaders(self) -> Dict[Region, int]:
+        """Lowest-ID live leader per region, as advertised in heartbeats."""
+        leaders: Dict[Region, int] = {}
+        if self.role == Role.LEADER and self.region is not None:
+            leaders[self.region] = self.id
+        for rid, t in self.leader_seen.items():
+            region = self.peer_region.get(rid)
+            if region is None or (self.now - t) > LEADER_TIMEOUT:
+                continue
+            if rid < leaders.get(region, rid + 1):
+                leaders[region] = rid
+        return leaders
+
+    def is_top_leader(self) -> bool:
+        if self.role != Role.LEADER:
+            return False
+        leaders = self.regional_leaders()
+        return bool(leaders) and self.id == min(leaders.values())
+
+    def _regions_with(self, capability: str, coverage: Dict[str, Set[Region]]) -> Set[Region]:
+        """Regions holding a robot with `capability`, cached per routing pass."""
+        if capability not in coverage:
+            coverage[capability] = {
+                self.region_of(r) for r in self.env.get_neighbors()
+                if self.env.has_capability(r, capability)
+            }
+            if self.capability == capability:
+                coverage[capability].add(self.region)
+        return coverage[capability]
+
+    # ------------------ TOP-LEVEL ROUTING ------------------
+    # The top-level leader keeps each open task in exactly one of: routing
+    # (gossiped until its regional leader acks), routed (held by that leader)
+    # or stranded (no cluster can serve it; region None until a capable robot
+    # shows up). Only routing costs anything per tick.
+    def reset_routing(self):
+        """Rebuild the routing tables when we become (or stop being) the top-level leader."""
+        self.routing.clear()
+        self.routed.clear()
+        self.stranded.clear()
+        if not self.top_leader:
+            return
+        for tid, task in self.known_tasks.items():
+            if not task.get("completed", False) and task.get("assigned_to") is None:
+                self.routing[tid] = task
+
+    def route(self, task: Dict, leaders: Dict[Region, int], coverage: Dict[str, Set[Region]],
+              avoid: Optional[Region] = None) -> bool:
+        """Pick the nearest led region able to serve `task`; strand it if there is none."""
+        tid = task["id"]
+        if task.get("completed", False) or task.get("assigned_to") is not None:
+            self.routing.pop(tid, None) # A cluster already took it
+            return False
+
+        capable = self._regions_with(task["capability"], coverage)
+        eligible = [r for r in leaders if r in capable and r != avoid]
+        if not eligible:
+            self.routing.pop(tid, None)
+            self.stranded.setdefault(task["capability"], {})[tid] = task
+            task["region"] = None
+            self.logger.info(f"Holding Task {tid}: no region can serve it ({task['capability']})")
+            return False
+
+        home = self.region_at(task["location"])
+        region = min(eligible, key=lambda r: (r != home, math.dist(r, home)))
+        if region != self.task_region(task):
+            task["region"] = region
+            self.logger.info(f"Routing Task {tid} to Region {region}")
+        self.routing[tid] = task
+        return True
+
+    def route_tasks(self):
+        """Top-level leader: hand each task to a cluster until one acks it."""
+        leaders = self.regional_leaders()
+        coverage: Dict[str, Set[Region]] = {}  # capability -> regions with a capable robot
+
+        # Clusters whose leader died or changed hand their tasks back
+        for key in [k for k in self.routed if leaders.get(k[0]) != k[1]]:
+            self.routing.update(self.routed.pop(key))
+
+        for task in list(self.routing.values()):
+            if task.get("completed", False) or task.get("assigned_to") is not None:
+                del self.routing[task["id"]]
+                continue
+
+            region = self.task_region(task)
+            if region not in leaders:
+                # New, or its cluster has no leader right now
+                if not self.route(task, leaders, coverage):
+                    continue
+                region = self.task_region(task)
+            elif random.random() >= 0.4:
+                continue # Gossip the route like we gossip assignments
+
+            self.send_route(task, leaders)
+
+    def send_route(self, task: Dict, leaders: Dict[Region, int]):
+        region = self.task_region(task)
+        self.send({
+            "type": MsgType.TASK_ROUTE,
+            "task_id": task["id"],
+            "task": task,
+            "region": region,
+            "to": leaders.get(region)
+        })
+
+    def unstrand(self, capability: str):
+        """A robot with `capability` joined or moved: try the tasks waiting for it again."""
+        tasks = self.stranded.pop(capability)
+        self.logger.info(f"Re-routing Tasks {sorted(tasks)}: capable Agent available ({capability})")
+        leaders = self.regional_leaders()
+        coverage: Dict[str, Set[Region]] = {}
+        for task in tasks.values():
+            self.route(task, leaders, coverage)
+
+    def drop_route(self, tid: int):
+        """Stop tracking a task that got assigned or completed."""
+        task = self.routing.pop(tid, None) or self.known_tasks.get(tid)
+        if task is None:
+            return
+        for key, held in list(self.routed.items()):
+            if held.pop(tid, None) is not None and not held:
+                del self.routed[key]
+        waiting = self.stranded.get(task["capability"])
+        if waiting is not None:
+            waiting.pop(tid, None)
+            if not waiting:
+                del self.stranded[task["capability"]]
+
+    def handle_task_route(self, msg: Dict):
+        tid = msg["task_id"]
+        if tid not in self.known_tasks:
+            self.handle_new_task(msg)
+        # Keep any local assignment state, only adopt the routing decision
+        task = self.known_tasks[tid]
+        region = self.task_region(msg)
+        task["region"] = region
+        if self.role == Role.LEADER and region is not None and region == self.region:
+            if not task.get("completed", False):
+                self.pending[tid] = task
+            self.send({
+                "type": MsgType.TASK_ROUTE_ACK,
+                "task_id": tid,
+                "region": region,
+                "to": msg["from"]
+            })
+
+    def handle_route_ack(self, msg: Dict):
+        tid = msg["task_id"]
+        task = self.routing.get(tid)
+        region = tuple(msg["region"])
+        if task is None or self.task_region(task) != region:
+            return
+        del self.routing[tid]
+        self.routed.setdefault((region, msg["from"]), {})[tid] = task
+
+    def handle_task_bounce(self, msg: Dict):
+        """A cluster cannot serve a task: move it, or hold it until someone can."""
+        if not self.top_leader:
+            return
+        tid = msg["task_id"]
+        if tid not in self.known_tasks:
+            self.handle_new_task(msg)
+        task = self.known_tasks[tid]
+        if task.get("completed", False):
+            return
+
+        leaders = self.regional_leaders()
+        region = self.task_region(msg)
+        if self.task_region(task) == region:
+            self.drop_route(tid)
+            self.logger.info(f"Re-routing Task {tid}: Region {region} cannot serve it")
+            self.route(task, leaders, {}, avoid=region)
+        # Answer every bounce, so the cluster stops once it hears where the task went
+        self.send_route(task, leaders)
+
     # ------------------ TASK LOGIC ------------------
+    def park_task(self, task: Dict):
+        """Move a task out of `pending` until a capable robot shows up."""
+        tid = task["id"]
+        self.pending.pop(tid, None)
+        self.parked.setdefault(task["capability"], set()).add(tid)
+        self.parked_ids.add(tid)
+
+    def forget_task(self, tid: int):
+        """Drop a finished task from the pending/parked bookkeeping."""
+        self.pending.pop(tid, None)
+        if tid not in self.parked_ids:
+            return
+        self.parked_ids.discard(tid)
+        cap = self.known_tasks[tid]["capability"]
+        self.parked[cap].discard(tid)
+        if not self.parked[cap]:
+            del self.parked[cap]
+
+    def unpark_task(self, tid: int):
+        self.forget_task(tid)
+        task = self.known_tasks.get(tid)
+        if task is not None and not task.get("completed", False):
+            self.pending[tid] = task
+
+    def reload_pending(self):
+        """Forget every parking decision and look at all open tasks again."""
+        self.parked.clear()
+        self.parked_ids.clear()
+        self.pending = {tid: t for tid, t in self.known_tasks.items() if not t.get("completed", False)}
+
+    def wake_parked(self, capability: Optional[str]):
+        """A robot with `capability` joined, recovered or came into range."""
+        woken = self.parked.get(capability)
+        if woken:
+            self.logger.info(f"Waking Tasks {sorted(woken)}: capable Agent available ({capability})")
+            for tid in list(woken):
+                self.unpark_task(tid)
+
     def _scan_neighbors_for_capability(self, capability: str) -> List[int]:
         """Helper to find capable neighbors safely."""
         robots = []
         for r in self.env.get_neighbors():
+            if self.hierarchical and self.region_of(r) != self.region:
+                continue
             if self.env.has_capability(r, capability):
                 robots.append(r)
         return robots
@@ -177,10 +510,15 @@ class Agent:
         if self.role != Role.LEADER:
             return
 
-        for task in self.known_tasks.values():
+        for task in list(self.pending.values()):
             
             # Guard Clauses
-            if task.get("completed", False): continue
+            if task.get("completed", False):
+                self.forget_task(task["id"])
+                continue
+            if self.hierarchical and self.task_region(task) != self.region:
+                self.pending.pop(task["id"]) # Back via handle_task_route if routed here
+                continue
 
             # 1. Gossip / Reliability Check (Pre-Lock)
             assigned_id = task.get("assigned_to")
@@ -205,8 +543,17 @@ class Agent:
             # 3. New Allocation
             candidates = self.get_capable_robots(task["capability"])
             if not candidates: 
-                # Only warn occasionally?
-                # self.logger.warning(f"No capable candidates for task {task['id']} (cap={task['capability']})")
+                if self.hierarchical:
+                    # Maybe another cluster can; repeat until the router answers
+                    self.send({
+                        "type": MsgType.TASK_BOUNCE,
+                        "task_id": task["id"],
+                        "task": task,
+                        "region": self.region
+                    })
+                else:
+                    # Park it until a capable robot shows up (see handle_heartbeat)
+                    self.park_task(task)
                 continue
 
             chosen = self.pick_closest(task, candidates)
@@ -215,6 +562,7 @@ class Agent:
                 task["assigned_to"] = chosen
                 task["lock_time"] = self.now
                 task["locked"] = True
+                self.publish(Event.ASSIGN, task_id=task["id"], to=chosen)
 
                 # Broadcast Assignment
                 self.logger.info(f"Assigning Task {task['id']} to Agent {chosen}")
@@ -235,8 +583,16 @@ class Agent:
         # For simplicity of this challenge, last-write-wins but respect 'completed'
         if task["id"] not in self.known_tasks:
              self.known_tasks[task["id"]] = task
+             if not task.get("completed", False):
+                 self.pending[task["id"]] = task
+             if self.top_leader and not task.get("completed", False) and task["assigned_to"] is None:
+                 self.routing[task["id"]] = task
 
     def handle_task_assign(self, msg: Dict):
+        # A cluster took it: stop routing
+        if self.top_leader:
+            self.drop_route(msg["task_id"])
+
         # Am I the target?
         if msg["to"] == self.id:
             tid = msg["task_id"]
@@ -245,6 +601,8 @@ class Agent:
             if "task" in msg:
                 self.known_tasks[tid] = msg["task"]
                 self.known_tasks[tid]["assigned_to"] = self.id
+                if tid not in self.parked_ids and not msg["task"].get("completed", False):
+                    self.pending[tid] = msg["task"]
 
     def complete_task(self):
         if self.current_task is None: return
@@ -252,8 +610,11 @@ class Agent:
         tid = self.current_task
         if tid in self.known_tasks:
             self.known_tasks[tid]["completed"] = True
+            self.forget_task(tid)
+            self.drop_route(tid)
             
             self.logger.info(f"Task {tid} COMPLETED.")
+            self.publish(Event.COMPLETE, task_id=tid)
             self.send({
                 "type": MsgType.TASK_DONE,
                 "task_id": tid
@@ -264,6 +625,8 @@ class Agent:
     # ------------------ MAIN LOOP ------------------
     def tick(self):
         self.now = self.env.get_time()
+        if self.hierarchical:
+            self.region = self.region_of(self.id)
 
         # 1. Process Inbox
         msgs = self.receive()
@@ -276,10 +639,18 @@ class Agent:
                 self.handle_new_task(msg)
             elif t == MsgType.TASK_ASSIGN:
                 self.handle_task_assign(msg)
+            elif t == MsgType.TASK_ROUTE:
+                self.handle_task_route(msg)
+            elif t == MsgType.TASK_ROUTE_ACK:
+                self.handle_route_ack(msg)
+            elif t == MsgType.TASK_BOUNCE:
+                self.handle_task_bounce(msg)
             elif t == MsgType.TASK_DONE:
                 tid = msg.get("task_id")
                 if tid in self.known_tasks:
                     self.known_tasks[tid]["completed"] = True
+                    self.forget_task(tid)
+                    self.drop_route(tid)
 
         # 2. Maintain Life (Throttle: 1Hz Heartbeat)
         if self.now - getattr(self, '_last_hb', 0.0) >= 1.0:
@@ -290,6 +661,14 @@ class Agent:
         if self.detect_leader_failure():
             self.elect_leader()
 
+        if self.hierarchical:
+            top = self.role == Role.LEADER and self.is_top_leader()
+            if top != self.top_leader:
+                self.top_leader = top
+                self.reset_routing()
+            if top:
+                self.route_tasks()
+
         if self.role == Role.LEADER:
             self.assign_tasks()
 
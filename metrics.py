@@ -0,0 +1,275 @@
+# Incremental swarm health metrics.
+#
+# Agents publish events (see agent.Event); SwarmMetrics folds them into
+# running counters so every query is O(1) regardless of fleet size.
+
+import json
+import logging
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from agent import Event, Role
+
+# Seconds; shared by all latency histograms
+DEFAULT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+RATE_WINDOW = 10  # Seconds of history behind send_rate/recv_rate
+
+
+class Histogram:
+    """Fixed-bucket histogram with running count/sum/max."""
+
+    def __init__(self, bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last bucket is +inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        labels = [str(b) for b in self.bounds] + ["inf"]
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class SwarmMetrics:
+    """
+    Event listener maintaining fleet-wide health counters.
+
+    Pass one instance to every Agent via `listeners=[metrics]`. When an
+    agent is removed from the simulation, call unregister() so its role
+    and term stop counting.
+
+    consensus_time measures "exactly one leader fleet-wide", which only
+    means something in flat mode. Once a hierarchical agent joins it is
+    reported as None; use leaders/leader_count per region instead.
+    """
+
+    def __init__(self, export_interval: float = 0.0, sink: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.logger = logging.getLogger("metrics")
+
+        # Per-agent last known (role, term)
+        self.agents: Dict[int, Tuple[Role, int]] = {}
+
+        # Leadership
+        self.leaders: Set[int] = set()
+        self.split_since: Optional[float] = None   # When leader count last left 1
+        self.consensus_time = Histogram()
+        self.hierarchical = False
+
+        # Terms
+        self.term_counts: Dict[int, int] = {}
+        self.min_term = 0
+        self.max_term = 0
+
+        # Tasks
+        self.assigned_at: Dict[int, float] = {}
+        self.completed: Set[int] = set()
+        self.task_latency = Histogram()
+
+        # Messages: running totals plus per-second buckets [second, sent, recv]
+        self.msgs_sent = 0
+        self.msgs_received = 0
+        self.rate_buckets: Deque[List[int]] = deque()
+        self.window_sent = 0
+        self.window_recv = 0
+        self.first_seen: Optional[float] = None
+        self.now = 0.0
+
+        # Export
+        self.export_interval = export_interval
+        self.sink = sink or self._log_sink
+        self.last_export: Optional[float] = None
+
+    # ------------------ QUERIES (O(1)) ------------------
+    @property
+    def leader_count(self) -> int:
+        return len(self.leaders)
+
+    @property
+    def term_divergence(self) -> int:
+        return self.max_term - self.min_term if self.term_counts else 0
+
+    def send_rate(self, now: float) -> float:
+        """Messages/second sent over the last RATE_WINDOW seconds."""
+        span = self._window_span(now)
+        return self.window_sent / span
+
+    def recv_rate(self, now: float) -> float:
+        span = self._window_span(now)
+        return self.window_recv / span
+
+    # ------------------ EVENT INGEST ------------------
+    def on_event(self, kind: str, agent_id: int, now: float, **fields):
+        if self.first_seen is None:
+            self.first_seen = now
+        self.now = max(self.now, now)
+
+        if kind == Event.JOIN:
+            self.hierarchical |= fields.get("hierarchical", False)
+            self._join(agent_id, now, Role(fields["role"]), fields["term"])
+        elif kind == Event.ROLE:
+            self._set_role(agent_id, now, Role(fields["new"]))
+        elif kind == Event.TERM:
+            self._set_term(agent_id, fields["new"])
+        elif kind == Event.ASSIGN:
+            self.assigned_at.setdefault(fields["task_id"], now)
+        elif kind == Event.COMPLETE:
+            tid = fields["task_id"]
+            if tid not in self.completed:
+                self.completed.add(tid)
+                start = self.assigned_at.pop(tid, None)
+                if start is not None:
+                    self.task_latency.observe(now - start)
+        elif kind == Event.SEND:
+            self.msgs_sent += fields["count"]
+            self._bucket(now)[1] += fields["count"]
+            self.window_sent += fields["count"]
+        elif kind == Event.RECV:
+            self.msgs_received += fields["count"]
+            self._bucket(now)[2] += fields["count"]
+            self.window_recv += fields["count"]
+
+        self.maybe_export(now)
+
+    def _bucket(self, now: float) -> List[int]:
+        second = int(now)
+        if not self.rate_buckets or self.rate_buckets[-1][0] != second:
+            self.rate_buckets.append([second, 0, 0])
+        self._expire_buckets(now)
+        return self.rate_buckets[-1]
+
+    def _window_start(self, now: float) -> int:
+        """First whole second still counted: the current one plus RATE_WINDOW - 1 before it."""
+        return int(now) - RATE_WINDOW + 1
+
+    def _expire_buckets(self, now: float):
+        start = self._window_start(max(now, self.now))
+        while self.rate_buckets and self.rate_buckets[0][0] < start:
+            _, sent, recv = self.rate_buckets.popleft()
+            self.window_sent -= sent
+            self.window_recv -= recv
+
+    def _window_span(self, now: float) -> float:
+        """Seconds covered by the buckets still kept (quiet seconds count as zero)."""
+        now = max(now, self.now)
+        self._expire_buckets(now)
+        if self.first_seen is None:
+            return 1.0
+        start = max(self._window_start(now), self.first_seen)
+        return max(now - start, 1e-9)
+
+    def unregister(self, agent_id: int, now: float):
+        """Forget a dead/removed agent."""
+        if agent_id not in self.agents:
+            return
+        self._set_role(agent_id, now, Role.FOLLOWER)
+        _, term = self.agents.pop(agent_id)
+        self._drop_term(term)
+
+    def _join(self, agent_id: int, now: float, role: Role, term: int):
+        if agent_id in self.agents:
+            self.unregister(agent_id, now)
+        if self.split_since is None:
+            self.split_since = now
+        self.agents[agent_id] = (Role.FOLLOWER, term)
+        self._add_term(term)
+        self._set_role(agent_id, now, role)
+
+    def _set_role(self, agent_id: int, now: float, role: Role):
+        old_role, term = self.agents.get(agent_id, (Role.FOLLOWER, 0))
+        self.agents[agent_id] = (role, term)
+        if old_role == role:
+            return
+
+        was_stable = len(self.leaders) == 1
+        if role == Role.LEADER:
+            self.leaders.add(agent_id)
+        else:
+            self.leaders.discard(agent_id)
+        stable = len(self.leaders) == 1
+
+        # Consensus = exactly one leader; time how long each split lasted
+        if was_stable and not stable:
+            self.split_since = now
+        elif stable and not was_stable and self.split_since is not None:
+            self.consensus_time.observe(now - self.split_since)
+            self.split_since = None
+
+    def _set_term(self, agent_id: int, term: int):
+        role, old = self.agents.get(agent_id, (Role.FOLLOWER, 0))
+        if agent_id in self.agents:
+            self._drop_term(old)
+        self.agents[agent_id] = (role, term)
+        self._add_term(term)
+
+    def _add_term(self, term: int):
+        if not self.term_counts:
+            self.min_term = self.max_term = term
+        self.term_counts[term] = self.term_counts.get(term, 0) + 1
+        self.min_term = min(self.min_term, term)
+        self.max_term = max(self.max_term, term)
+
+    def _drop_term(self, term: int):
+        self.term_counts[term] -= 1
+        if self.term_counts[term]:
+            return
+        del self.term_counts[term]
+        if not self.term_counts:
+            return
+        # Terms only move upwards, so the bounds advance monotonically
+        while self.min_term not in self.term_counts:
+            self.min_term += 1
+        while self.max_term not in self.term_counts:
+            self.max_term -= 1
+
+    # ------------------ EXPORT ------------------
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        self.now = max(self.now, now)
+        return {
+            "time": now,
+            "agents": len(self.agents),
+            "leader_count": self.leader_count,
+            "leaders": sorted(self.leaders),
+            "max_term": self.max_term,
+            "term_divergence": self.term_divergence,
+            "consensus_time": None if self.hierarchical else self.consensus_time.to_dict(),
+            "tasks_in_flight": len(self.assigned_at),
+            "tasks_completed": len(self.completed),
+            "task_latency": self.task_latency.to_dict(),
+            "msgs_sent": self.msgs_sent,
+            "msgs_received": self.msgs_received,
+            "send_rate": self.send_rate(now),
+            "recv_rate": self.recv_rate(now),
+        }
+
+    def maybe_export(self, now: float):
+        """Emit a snapshot to the sink once every export_interval seconds."""
+        if self.export_interval <= 0:
+            return
+        if self.last_export is None:
+            self.last_export = now
+            return
+        if now - self.last_export >= self.export_interval:
+            self.export(now)
+
+    def export(self, now: float):
+        self.sink(self.snapshot(now))
+        self.last_export = now
+
+    def _log_sink(self, snap: Dict[str, Any]):
+        self.logger.info(json.dumps(snap))
@@ -0,0 +1,266 @@
+# Columnar mission trace.
+#
+# TraceWriter appends per-tick fleet state and protocol events to one
+# fixed-width binary file per column, flushing in chunks. Each state chunk
+# also gets an agent -> row index. TraceReader memory-maps those files so
+# queries touch only the columns (and rows) they need.
+
+import json
+import mmap
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from agent import Event
+
+NONE = -1  # Sentinel for leader_id / current_task = None
+
+STATE_COLUMNS = (
+    ("time", "d"),
+    ("agent", "i"),
+    ("role", "b"),
+    ("term", "i"),
+    ("leader", "i"),
+    ("x", "f"),
+    ("y", "f"),
+    ("task", "i"),
+)
+
+EVENT_COLUMNS = (
+    ("time", "d"),
+    ("agent", "i"),
+    ("kind", "b"),
+    ("a", "i"),   # First event field (e.g. old role, task_id)
+    ("b", "i"),   # Second event field (e.g. new role, target robot)
+)
+
+# Per state chunk: (agent, row) pairs sorted by agent, then row
+INDEX_COLUMNS = (
+    ("agent", "i"),
+    ("row", "q"),
+)
+
+# End offset (exclusive) of each chunk in the state/index files
+CHUNK_COLUMNS = (
+    ("end", "q"),
+)
+
+EVENT_CODES = {kind: code for code, kind in enumerate(
+    (Event.JOIN, Event.ROLE, Event.TERM, Event.ASSIGN, Event.COMPLETE, Event.SEND, Event.RECV)
+)}
+
+# SEND/RECV fire on every message; counters belong in SwarmMetrics, not here
+DEFAULT_EVENTS = (Event.JOIN, Event.ROLE, Event.TERM, Event.ASSIGN, Event.COMPLETE)
+
+
+class _Table:
+    """Column buffers plus their append-only files."""
+
+    def __init__(self, directory: str, name: str, columns: Tuple[Tuple[str, str], ...]):
+        self.columns = columns
+        self.buffers = {col: array(code) for col, code in columns}
+        # Truncate: a trace directory holds exactly one run
+        self.files = {
+            col: open(os.path.join(directory, f"{name}.{col}.bin"), "wb")
+            for col, _ in columns
+        }
+        self.rows_flushed = 0
+
+    def __len__(self) -> int:
+        return len(self.buffers[self.columns[0][0]])
+
+    def append(self, row: Tuple):
+        for (col, _), value in zip(self.columns, row):
+            self.buffers[col].append(value)
+
+    def flush(self):
+        self.rows_flushed += len(self)
+        for col, buf in self.buffers.items():
+            buf.tofile(self.files[col])
+            del buf[:]
+            self.files[col].flush()
+
+    def close(self):
+        self.flush()
+        for f in self.files.values():
+            f.close()
+
+
+class TraceWriter:
+    """
+    Streams fleet state to `directory` as the simulation runs.
+
+    Call record_tick() once per simulation step and pass the writer as an
+    Agent listener to capture protocol events. Data hits disk every
+    `chunk_rows` rows and on close(). Existing trace files in `directory`
+    are overwritten.
+    """
+
+    def __init__(self, directory: str, chunk_rows: int = 4096, events=DEFAULT_EVENTS):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.events = set(events)
+
+        self.state = _Table(directory, "state", STATE_COLUMNS)
+        self.state_index = _Table(directory, "state_index", INDEX_COLUMNS)
+        self.state_chunks = _Table(directory, "state_chunks", CHUNK_COLUMNS)
+        self.event_log = _Table(directory, "events", EVENT_COLUMNS)
+        self._write_schema()
+
+    def _write_schema(self):
+        schema = {
+            "state": [[col, code, array(code).itemsize] for col, code in STATE_COLUMNS],
+            "state_index": [[col, code, array(code).itemsize] for col, code in INDEX_COLUMNS],
+            "state_chunks": [[col, code, array(code).itemsize] for col, code in CHUNK_COLUMNS],
+            "events": [[col, code, array(code).itemsize] for col, code in EVENT_COLUMNS],
+            "event_codes": EVENT_CODES,
+            "byteorder": "little" if array("i", [1]).tobytes()[0] == 1 else "big",
+        }
+        with open(os.path.join(self.directory, "schema.json"), "w") as f:
+            json.dump(schema, f, indent=2)
+
+    def record_tick(self, now: float, agents: List[Any]):
+        for a in agents:
+            x, y = a.env.get_position(a.id) or (0.0, 0.0)
+            self.state.append((
+                now,
+                a.id,
+                int(a.role),
+                a.term,
+                NONE if a.leader_id is None else a.leader_id,
+                x,
+                y,
+                NONE if a.current_task is None else a.current_task,
+            ))
+        if len(self.state) >= self.chunk_rows:
+            self._flush_state()
+
+    def _flush_state(self):
+        """Write the buffered state chunk along with its agent index."""
+        if not len(self.state):
+            return
+        base = self.state.rows_flushed
+        agents = self.state.buffers["agent"]
+        for i in sorted(range(len(agents)), key=lambda i: (agents[i], i)):
+            self.state_index.append((agents[i], base + i))
+        self.state.flush()
+        self.state_index.flush()
+        self.state_chunks.append((self.state.rows_flushed,))
+        self.state_chunks.flush()
+
+    def on_event(self, kind: str, agent_id: int, now: float, **fields):
+        if kind not in self.events:
+            return
+        values = [NONE if v is None else int(v) for v in list(fields.values())[:2]] + [NONE, NONE]
+        self.event_log.append((now, agent_id, EVENT_CODES[kind], values[0], values[1]))
+        if len(self.event_log) >= self.chunk_rows:
+            self.event_log.flush()
+
+    def close(self):
+        self._flush_state()
+        self.state.close()
+        self.state_index.close()
+        self.state_chunks.close()
+        self.event_log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TraceReader:
+    """
+    Memory-mapped, read-only view of a trace directory.
+
+    Columns are exposed as typed memoryviews; nothing is copied until a
+    query slices it. Rows are in time order, so time ranges use bisection.
+    """
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "schema.json")) as f:
+            self.schema = json.load(f)
+        self.event_names = {code: kind for kind, code in self.schema["event_codes"].items()}
+
+        self._maps: List[mmap.mmap] = []
+        self.state = self._map_table(directory, "state")
+        self.state_index = self._map_table(directory, "state_index")
+        self.state_chunks = self._map_table(directory, "state_chunks")
+        self.events = self._map_table(directory, "events")
+
+    def _map_table(self, directory: str, name: str) -> Dict[str, Any]:
+        table = {}
+        for col, code, _ in self.schema[name]:
+            path = os.path.join(directory, f"{name}.{col}.bin")
+            if os.path.getsize(path) == 0:
+                table[col] = memoryview(array(code))  # mmap refuses empty files
+                continue
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps.append(mm)
+            table[col] = memoryview(mm).cast(code)
+        return table
+
+    def close(self):
+        for table in (self.state, self.state_index, self.state_chunks, self.events):
+            for view in table.values():
+                view.release()
+        for mm in self._maps:
+            mm.close()
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------ QUERIES ------------------
+    def _span(self, table: Dict[str, Any], t0: float, t1: float) -> Tuple[int, int]:
+        times = table["time"]
+        return bisect_left(times, t0), bisect_right(times, t1)
+
+    def rows_for(self, agent_id: int) -> Iterator[int]:
+        """State row numbers for `agent_id`, in time order, via the chunk index."""
+        idx_agent, idx_row = self.state_index["agent"], self.state_index["row"]
+        start = 0
+        for end in self.state_chunks["end"]:
+            # Each chunk's index is sorted by agent: bisect within it
+            lo = bisect_left(idx_agent, agent_id, start, end)
+            hi = bisect_right(idx_agent, agent_id, lo, end)
+            yield from idx_row[lo:hi]
+            start = end
+
+    def leader_history(self, agent_id: int) -> List[Tuple[float, Optional[int], int]]:
+        """(time, leader_id, term) each time `agent_id`'s view of the leader changed."""
+        leaders, terms, times = (self.state[c] for c in ("leader", "term", "time"))
+        history = []
+        last = None
+        for i in self.rows_for(agent_id):
+            view = (leaders[i], terms[i])
+            if view != last:
+                history.append((times[i], None if leaders[i] == NONE else leaders[i], terms[i]))
+                last = view
+        return history
+
+    def terms_between(self, t0: float, t1: float) -> Set[int]:
+        lo, hi = self._span(self.state, t0, t1)
+        return set(self.state["term"][lo:hi])
+
+    def events_between(self, t0: float, t1: float, kind: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        lo, hi = self._span(self.events, t0, t1)
+        ev = self.events
+        code = self.schema["event_codes"][kind] if kind is not None else None
+        for i in range(lo, hi):
+            if code is not None and ev["kind"][i] != code:
+                continue
+            yield {
+                "time": ev["time"][i],
+                "agent": ev["agent"][i],
+                "kind": self.event_names[ev["kind"][i]],
+                "a": ev["a"][i],
+                "b": ev["b"][i],
+            }
@@ -0,0 +1,254 @@
+# Loopback UDP transport for running each robot as its own process.
+#
+# Implements the same send/receive/get_time interface as LossyEnv, so
+# Agent.run works unchanged. Outgoing messages are queued, coalesced and
+# flushed as a handful of multicast datagrams once per tick.
+
+import json
+import random
+import socket
+import struct
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# ------------------ CONSTANTS ------------------
+MCAST_GROUP = "239.255.42.99"
+MCAST_PORT = 50042
+LOOPBACK_IF = "127.0.0.1"
+
+MAX_DATAGRAM = 60000        # Bytes per datagram (stay under the 64K UDP limit)
+RECV_BUDGET = 1024          # Max datagrams drained per receive() call
+NEIGHBOR_TIMEOUT = 5.0      # Seconds before a silent peer drops out of range
+
+
+class UdpEnv:
+    """
+    One robot's view of the swarm over loopback UDP multicast.
+
+    Messages sent during a tick are held in an outbox and flushed on the
+    next get_time()/receive() call, i.e. at the start of the next tick.
+    Heartbeats from the same sender and repeated task messages for the
+    same task (and target) are coalesced so only the newest copy goes out.
+
+    Each message carries the time it was queued, so the reported latency
+    includes the wait in the outbox, not just time on the wire.
+    """
+
+    def __init__(self, drop_prob=0.3, group=MCAST_GROUP, port=MCAST_PORT):
+        self.drop_prob = drop_prob
+        self.group = group
+        self.port = port
+
+        self.robot_id: Optional[int] = None
+        self.capability: Optional[str] = None
+        self.position: Tuple[float, float] = (0.0, 0.0)
+
+        # Peer knowledge, learned from datagram headers
+        self.positions: Dict[int, Tuple[float, float]] = {}
+        self.capabilities: Dict[int, str] = {}
+        self.heard: Dict[int, float] = {}
+
+        self.inbox: List[Dict[str, Any]] = []
+        self.outbox: Dict[Any, bytes] = {}  # coalesce key -> encoded [queued at, msg]
+
+        self.stats = {
+            "msgs_queued": 0,
+            "msgs_coalesced": 0,
+            "msgs_dropped": 0,
+            "msgs_sent": 0,
+            "datagrams_sent": 0,
+            "bytes_sent": 0,
+            "msgs_received": 0,
+            "datagrams_received": 0,
+            "latency_sum": 0.0,
+            "send_cpu": 0.0,
+            "recv_cpu": 0.0,
+        }
+
+        self.sock = self._open_socket()
+
+    def _open_socket(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        sock.bind(("", self.port))
+
+        mreq = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton(LOOPBACK_IF))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(LOOPBACK_IF))
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 0)  # Never leave the host
+        sock.setblocking(False)
+        return sock
+
+    def register(self, robot_id, capability=None, position=None):
+        self.robot_id = robot_id
+        self.capability = capability
+        if position is not None:
+            self.position = tuple(position)
+        self.positions[robot_id] = self.position
+        if capability is not None:
+            self.capabilities[robot_id] = capability
+        self.heard[robot_id] = time.time()
+
+    def close(self):
+        self.flush()
+        self.sock.close()
+
+    # -------- simulator-like APIs --------
+    def send(self, msg):
+        cpu_start = time.process_time()
+        self.stats["msgs_queued"] += 1
+        key = self._coalesce_key(msg)
+        if key in self.outbox:
+            self.stats["msgs_coalesced"] += 1
+            del self.outbox[key]  # Re-insert so ordering follows the newest copy
+        # Encode now: the agent keeps mutating task dicts after sending
+        self.outbox[key] = json.dumps([time.time(), msg]).encode()
+        self.stats["send_cpu"] += time.process_time() - cpu_start
+
+    def receive(self, robot_id):
+        self.flush()
+        self._drain()
+        msgs = self.inbox
+        self.inbox = []
+        return msgs
+
+    def get_time(self):
+        self.flush()
+        return time.time()
+
+    def get_position(self, robot_id):
+        return self.positions.get(robot_id, (0.0, 0.0))
+
+    def get_neighbors(self):
+        now = time.time()
+        return [rid for rid, t in self.heard.items() if (now - t) <= NEIGHBOR_TIMEOUT]
+
+    def has_capability(self, robot_id, capability):
+        return self.capabilities.get(robot_id) == capability
+
+    # -------- transport internals --------
+    def _coalesce_key(self, msg) -> Any:
+        t = msg.get("type")
+        if t == "HB":
+            return (t, msg.get("from"))
+        if t == "TASK_ASSIGN":
+            return (t, msg.get("task_id"), msg.get("to"))
+        if t == "TASK_NEW":
+            return (t, msg["task"].get("id"))
+        if t in ("TASK_DONE", "TASK_ROUTE"):
+            return (t, msg.get("task_id"))
+        # Everything else is unique; use a running sequence number
+        return ("seq", self.stats["msgs_queued"])
+
+    def _header(self) -> bytes:
+        return json.dumps({
+            "src": self.robot_id,
+            "cap": self.capability,
+            "pos": self.position,
+        }).encode()
+
+    def flush(self):
+        """Encode the outbox into as few datagrams as fit MAX_DATAGRAM."""
+        if not self.outbox:
+            return
+        cpu_start = time.process_time()
+
+        payloads = []
+        for p in self.outbox.values():
+            # Loss injection, per message, to match LossyEnv.drop_prob
+            if random.random() <= self.drop_prob:
+                self.stats["msgs_dropped"] += 1
+                continue
+            payloads.append(p)
+        self.outbox.clear()
+
+        header = self._header()
+        batch = [header]
+        size = len(header)
+        for p in payloads:
+            if size + 1 + len(p) > MAX_DATAGRAM and len(batch) > 1:
+                self._send_datagram(batch)
+                batch = [header]
+                size = len(header)
+            batch.append(p)
+            size += 1 + len(p)
+        if len(batch) > 1:
+            self._send_datagram(batch)
+
+        self.stats["send_cpu"] += time.process_time() - cpu_start
+
+    def _send_datagram(self, lines: List[bytes]):
+        data = b"\n".join(lines)
+        try:
+            self.sock.sendto(data, (self.group, self.port))
+        except OSError:
+            # Buffer full (ENOBUFS/EAGAIN) or oversized (EMSGSIZE): behave like any other lost packet
+            self.stats["msgs_dropped"] += len(lines) - 1
+            return
+        self.stats["msgs_sent"] += len(lines) - 1
+        self.stats["datagrams_sent"] += 1
+        self.stats["bytes_sent"] += len(data)
+
+    def _drain(self):
+        """Non-blocking bulk receive of everything queued on the socket."""
+        cpu_start = time.process_time()
+        for _ in range(RECV_BUDGET):
+            try:
+                data = self.sock.recv(65535)
+            except (BlockingIOError, InterruptedError):
+                break
+
+            now = time.time()
+            try:
+                header, stamped = self._decode(data)
+            except (ValueError, TypeError, AttributeError):
+                continue  # Foreign or malformed traffic on our group/port
+
+            src = header.get("src")
+            if src is not None:
+                self.heard[src] = now
+                self.positions[src] = header["pos"]
+                if header.get("cap") is not None:
+                    self.capabilities[src] = header["cap"]
+
+            for queued_at, msg in stamped:
+                self.inbox.append(msg)
+                self.stats["latency_sum"] += now - queued_at
+            self.stats["datagrams_received"] += 1
+            self.stats["msgs_received"] += len(stamped)
+        self.stats["recv_cpu"] += time.process_time() - cpu_start
+
+    @staticmethod
+    def _decode(data: bytes) -> Tuple[Dict[str, Any], List[Tuple[float, Dict[str, Any]]]]:
+        """Parse one datagram; raises on anything not shaped like ours."""
+        lines = data.split(b"\n")
+        header = json.loads(lines[0])
+        header["pos"] = tuple(header.get("pos") or (0.0, 0.0))
+        stamped = []
+        for line in lines[1:]:
+            queued_at, msg = json.loads(line)
+            if not isinstance(msg, dict):
+                raise TypeError("message is not an object")
+            stamped.append((float(queued_at), msg))
+        return header, stamped
+
+    def summary(self) -> Dict[str, float]:
+        """Per-message overhead figures derived from the raw counters."""
+        s = self.stats
+        sent = max(s["msgs_sent"], 1)
+        recv = max(s["msgs_received"], 1)
+        return {
+            "msgs_queued": s["msgs_queued"],
+            "msgs_coalesced": s["msgs_coalesced"],
+            "msgs_sent": s["msgs_sent"],
+            "datagrams_sent": s["datagrams_sent"],
+            "msgs_received": s["msgs_received"],
+            "msgs_per_datagram": s["msgs_sent"] / max(s["datagrams_sent"], 1),
+            "coalesced_ratio": s["msgs_coalesced"] / max(s["msgs_queued"], 1),
+            "send_cpu_us_per_msg": 1e6 * s["send_cpu"] / sent,
+            "recv_cpu_us_per_msg": 1e6 * s["recv_cpu"] / recv,
+            "latency_ms": 1e3 * s["latency_sum"] / recv,
+        }
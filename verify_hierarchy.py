@@ -0,0 +1,124 @@
+from agent import Agent, Event, Role, REGION_SIZE
+from test_env import LossyEnv
+from metrics import SwarmMetrics
+from collections import Counter
+import random
+
+class AssignmentCounter:
+    """Listener tallying how many assignments each leader made."""
+    def __init__(self):
+        self.by_leader = Counter()
+
+    def on_event(self, kind, agent_id, now, **fields):
+        if kind == Event.ASSIGN:
+            self.by_leader[agent_id] += 1
+
+def run_hierarchy_demo(n_agents=40, n_tasks=40):
+    print(f"--- HIERARCHICAL REGIONAL LEADERSHIP ({n_agents} Robots, {n_tasks} Tasks, 30% Loss) ---")
+
+    env = LossyEnv(drop_prob=0.3)
+    metrics = SwarmMetrics()
+    tally = AssignmentCounter()
+    field = 2 * REGION_SIZE  # 2x2 regions
+
+    agents = []
+    for i in range(1, n_agents + 1):
+        cap = "camera" if i % 2 else "lidar"
+        a = Agent(i, cap, env, listeners=[metrics, tally], hierarchical=True)
+        env.register(i)
+        env.positions[i] = (random.uniform(0, field), random.uniform(0, field))
+        env.capabilities[i] = cap
+        agents.append(a)
+
+    # 1. Let regional leaders emerge
+    for _ in range(50):
+        for a in agents: a.step()
+        env.tick()
+
+    regional = sorted((a.region, a.id) for a in agents if a.role == Role.LEADER)
+    top = [a.id for a in agents if a.is_top_leader()]
+    print(f"Regional Leaders: {regional}")
+    print(f"Top-Level Leader: {top}")
+
+    # 2. Inject tasks across the whole field
+    print(f"\n[INJECT] {n_tasks} tasks")
+    for tid in range(1, n_tasks + 1):
+        task = {
+            "id": tid,
+            "location": (random.uniform(0, field), random.uniform(0, field)),
+            "capability": random.choice(["camera", "lidar"]),
+            "assigned_to": None,
+            "locked": False
+        }
+        for _ in range(8): # Persistent operator
+            env.send({"type": "TASK_NEW", "task": task})
+
+    # 3. Kill one regional leader mid-mission to exercise per-cluster failover
+    for step in range(150):
+        if step == 20:
+            victim = next(a for a in agents if a.role == Role.LEADER and not a.is_top_leader())
+            agents.remove(victim)
+            metrics.unregister(victim.id, env.time)
+            print(f"Killed Regional Leader {victim.id} of Region {victim.region}")
+        for a in agents: a.step()
+        env.tick()
+
+    # 4. Report
+    print(f"\n--- REPORT ---")
+    print(f"Tasks Completed: {len(metrics.completed)}/{n_tasks}")
+    print(f"Assignments per Leader: {dict(sorted(tally.by_leader.items()))}")
+    print(f"Regional Leaders Now: {sorted(metrics.leaders)}")
+
+    if len(metrics.completed) == n_tasks and len(tally.by_leader) > 1:
+        print("PASS: Assignment work spread across regional leaders.")
+    else:
+        print("FAIL: Tasks left unassigned or work not distributed.")
+
+def run_reroute_demo():
+    print("\n--- RE-ROUTING A STRANDED TASK ---")
+
+    env = LossyEnv(drop_prob=0.3)
+    metrics = SwarmMetrics()
+
+    # Camera-only clusters in regions (0,0) and (1,1)
+    agents = []
+    for i, pos in zip(range(1, 5), [(5, 5), (10, 10), (30, 30), (40, 40)]):
+        agents.append(Agent(i, "camera", env, listeners=[metrics], hierarchical=True))
+        env.register(i)
+        env.positions[i] = pos
+        env.capabilities[i] = "camera"
+
+    for _ in range(50):
+        for a in agents: a.step()
+        env.tick()
+
+    # A lidar task lands in region (1,1); nobody can do it yet
+    print("[INJECT] Lidar task 5 at (32, 32)")
+    task = {"id": 5, "location": (32, 32), "capability": "lidar", "assigned_to": None, "locked": False}
+    for _ in range(8):
+        env.send({"type": "TASK_NEW", "task": task})
+    for _ in range(100):
+        for a in agents: a.step()
+        env.tick()
+
+    # A lidar robot joins in the other region
+    print("[JOIN] Lidar Agent 5 at (4, 4)")
+    lidar = Agent(5, "lidar", env, listeners=[metrics], hierarchical=True)
+    env.register(5)
+    env.positions[5] = (4, 4)
+    env.capabilities[5] = "lidar"
+    agents.append(lidar)
+
+    for _ in range(600):
+        for a in agents: a.step()
+        env.tick()
+
+    print(f"Task 5 Region: {lidar.known_tasks.get(5, {}).get('region')}")
+    if 5 in metrics.completed:
+        print("PASS: Stranded task re-routed to the region that can serve it.")
+    else:
+        print("FAIL: Task stuck in a region without capable robots.")
+
+if __name__ == "__main__":
+    run_hierarchy_demo()
+    run_reroute_demo()
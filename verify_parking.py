@@ -0,0 +1,142 @@
+from agent import Agent, Role, MsgType
+from test_env import LossyEnv
+
+class CountingAgent(Agent):
+    """Agent that counts how often it scans the fleet for candidates."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scans = 0
+        self.task_msgs = 0 # Everything but heartbeats
+
+    def get_capable_robots(self, capability):
+        self.scans += 1
+        return super().get_capable_robots(capability)
+
+    def send(self, msg):
+        if msg["type"] != MsgType.HB:
+            self.task_msgs += 1
+        super().send(msg)
+
+def run_parking_demo(n_stuck=200):
+    print(f"--- PARKED TASKS ({n_stuck} Unassignable + 1 Sonar Task) ---")
+
+    # 1. Setup: a camera-only fleet, clear comms
+    env = LossyEnv(drop_prob=0.0)
+    agents = []
+    for i in range(1, 6):
+        agents.append(CountingAgent(i, "camera", env))
+        env.register(i)
+        env.positions[i] = (i * 5.0, 0.0)
+        env.capabilities[i] = "camera"
+
+    for _ in range(30):
+        for a in agents: a.step()
+        env.tick()
+    leader = next(a for a in agents if a.role == Role.LEADER)
+    print(f"Leader: {leader.id}")
+
+    # 2. Inject tasks for capabilities nobody has
+    print("\n[INJECT] Sonar task 1 and", n_stuck, "LIDAR tasks")
+    env.send({"type": "TASK_NEW", "task": {"id": 1, "location": (10, 10), "capability": "sonar"}})
+    for tid in range(100, 100 + n_stuck):
+        env.send({"type": "TASK_NEW", "task": {"id": tid, "location": (20, 20), "capability": "lidar"}})
+
+    for _ in range(100):
+        for a in agents: a.step()
+        env.tick()
+
+    scans_parked = leader.scans
+    print(f"Candidate Scans After 100 Ticks: {scans_parked} (tasks: {n_stuck + 1})")
+    print(f"Pending: {len(leader.pending)} | Parked: { {c: len(t) for c, t in leader.parked.items()} }")
+
+    # 3. A sonar robot joins
+    print("\n[JOIN] Sonar Agent 6")
+    sonar = CountingAgent(6, "sonar", env)
+    env.register(6)
+    env.positions[6] = (12.0, 12.0)
+    env.capabilities[6] = "sonar"
+    agents.append(sonar)
+
+    for _ in range(30):
+        for a in agents: a.step()
+        env.tick()
+
+    # 4. Report
+    task = leader.known_tasks[1]
+    print(f"\n--- REPORT ---")
+    print(f"Sonar Task Assigned To: {task.get('assigned_to')} | Completed: {task.get('completed', False)}")
+    print(f"LIDAR Tasks Still Parked: {len(leader.parked.get('lidar', ()))}")
+    print(f"Extra Scans After Wake: {leader.scans - scans_parked}")
+
+    if (scans_parked == n_stuck + 1 and task.get("assigned_to") == 6
+            and len(leader.parked.get("lidar", ())) == n_stuck and 1 not in leader.parked_ids):
+        print("PASS: Parked tasks scanned once and woken by a capable robot.")
+    else:
+        print("FAIL: Parking did not behave as expected.")
+
+def run_hierarchical_parking_demo(n_stuck=200):
+    print(f"\n--- STRANDED TASKS, HIERARCHICAL ({n_stuck} Unassignable + 1 Sonar Task) ---")
+
+    # 1. Setup: camera-only clusters in four regions, clear comms
+    env = LossyEnv(drop_prob=0.0)
+    agents = []
+    positions = [(5, 5), (10, 10), (30, 5), (40, 10), (5, 30), (10, 40), (30, 30), (40, 40)]
+    for i, pos in enumerate(positions, 1):
+        agents.append(CountingAgent(i, "camera", env, hierarchical=True))
+        env.register(i)
+        env.positions[i] = pos
+        env.capabilities[i] = "camera"
+
+    for _ in range(30):
+        for a in agents: a.step()
+        env.tick()
+    top = next(a for a in agents if a.top_leader)
+    print(f"Top-Level Leader: {top.id}")
+
+    # 2. Inject tasks for capabilities nobody has, spread over all regions
+    print("\n[INJECT] Sonar task 1 and", n_stuck, "LIDAR tasks")
+    env.send({"type": "TASK_NEW", "task": {"id": 1, "location": (35, 35), "capability": "sonar"}})
+    for tid in range(100, 100 + n_stuck):
+        env.send({"type": "TASK_NEW", "task": {"id": tid, "location": (tid * 7 % 50, tid * 13 % 50), "capability": "lidar"}})
+
+    for _ in range(100):
+        for a in agents: a.step()
+        env.tick()
+    scans_stuck = sum(a.scans for a in agents)
+    msgs_stuck = sum(a.task_msgs for a in agents)
+
+    for _ in range(200):
+        for a in agents: a.step()
+        env.tick()
+    extra_scans = sum(a.scans for a in agents) - scans_stuck
+    extra_msgs = sum(a.task_msgs for a in agents) - msgs_stuck
+    print(f"Over 200 More Ticks: {extra_scans} candidate scans, {extra_msgs} task messages")
+    print(f"Stranded at Top-Level Leader: { {c: len(t) for c, t in top.stranded.items()} }")
+
+    # 3. A sonar robot joins region (1, 1)
+    print("\n[JOIN] Sonar Agent 9")
+    sonar = CountingAgent(9, "sonar", env, hierarchical=True)
+    env.register(9)
+    env.positions[9] = (32.0, 32.0)
+    env.capabilities[9] = "sonar"
+    agents.append(sonar)
+
+    for _ in range(30):
+        for a in agents: a.step()
+        env.tick()
+
+    # 4. Report
+    task = top.known_tasks[1]
+    print(f"\n--- REPORT ---")
+    print(f"Sonar Task Region: {task.get('region')} | Assigned To: {task.get('assigned_to')} | Completed: {task.get('completed', False)}")
+    print(f"LIDAR Tasks Still Stranded: {len(top.stranded.get('lidar', {}))}")
+
+    if (extra_scans == 0 and extra_msgs == 0 and task.get("assigned_to") == 9
+            and len(top.stranded.get("lidar", {})) == n_stuck):
+        print("PASS: Stuck tasks cost nothing per tick and were re-routed when a capable robot joined.")
+    else:
+        print("FAIL: Stranded tasks did not behave as expected.")
+
+if __name__ == "__main__":
+    run_parking_demo()
+    run_hierarchical_parking_demo()
@@ -3,6 +3,7 @@ import time
 import sys
 from agent import Agent, Role
 from test_env import LossyEnv
+from metrics import SwarmMetrics
 import random
 
 # ANSI Colors for Naval Aesthetic
@@ -69,6 +70,7 @@ def draw_map(agents, task=None, width=50, height=20):
 def run_visual_demo():
     # Setup
     env = LossyEnv(drop_prob=0.6)
+    metrics = SwarmMetrics()
     agents = []
     
     # 10 Naval Roles
@@ -79,7 +81,7 @@ def run_visual_demo():
     
     for i in range(1, 11):
         cap = roles[i-1]
-        a = Agent(i, cap, env)
+        a = Agent(i, cap, env, listeners=[metrics])
         env.capabilities[i] = cap
         env.register(i)
         agents.append(a)
@@ -121,11 +123,11 @@ def run_visual_demo():
                 # Schedule NEXT kill (random 20-40s later)
                 next_kill_time = current_time + random.randint(20, 40)
                 
-                leaders = [a for a in agents if a.role == Role.LEADER]
-                if leaders:
-                    victim = leaders[0]
+                if metrics.leaders:
+                    victim = next(a for a in agents if a.id == min(metrics.leaders))
                     # Kill it
                     agents.remove(victim)
+                    metrics.unregister(victim.id, current_time)
                     graveyard.append(f"T={current_time:.1f}s: Killed Agent {victim.id} (Role: {victim.capability.upper()} LEADER)")
             
             # -------------------------------------
@@ -135,9 +137,8 @@ def run_visual_demo():
             env.tick()
             
             # Update Info for Draw
-            active_leaders = [a.id for a in agents if a.role == Role.LEADER]
-            display_term = 0
-            if agents: display_term = agents[0].term
+            active_leaders = sorted(metrics.leaders)
+            display_term = metrics.max_term
 
             # Draw
             clear_screen()
@@ -147,7 +148,8 @@ def run_visual_demo():
             
             # Telemetry
             print(f"{BOLD}FLEET STATUS ({len(agents)} SURVIVORS):{RESET}")
-            print(f"  Active Leaders: {active_leaders}")
+            print(f"  Active Leaders: {active_leaders} | Term Divergence: {metrics.term_divergence}")
+            print(f"  Consensus Time: mean {metrics.consensus_time.mean:.1f}s over {metrics.consensus_time.count} failovers")
             
             print(f"{BOLD}CASUALTY REPORT:{RESET}")
             for g in graveyard[-5:]: # Show last 5 deaths